@@ -11,7 +11,9 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
 from pathlib import Path
+import importlib.util
 import os
+import warnings
 import dj_database_url
 from dotenv import load_dotenv
 
@@ -108,12 +110,88 @@ WSGI_APPLICATION = 'config.wsgi.application'
 #     }
 # }
 
+# Connection reuse:
+# CONN_MAX_AGE keeps each worker's connection open between requests instead
+# of paying the TCP + TLS handshake to Neon on every request, and health
+# checks throw away connections the server closed while we were idle.
+# DB_POOL=true switches to psycopg 3's connection pool (Django 5.1+) -
+# pooling and CONN_MAX_AGE are mutually exclusive, so CONN_MAX_AGE is
+# forced to 0 in that case. requirements.txt pins psycopg2, which can't
+# pool: install "psycopg[binary,pool]" first, otherwise DB_POOL is ignored
+# (with a warning) and we fall back to persistent connections.
+DB_POOL = os.environ.get("DB_POOL", "").lower() in ("1", "true", "yes")
+
+if DB_POOL and not (importlib.util.find_spec("psycopg")
+                    and importlib.util.find_spec("psycopg_pool")):
+    warnings.warn("DB_POOL is set but psycopg 3 / psycopg_pool is not "
+                  "installed - using persistent connections instead.")
+    DB_POOL = False
+
 DATABASES = {
     "default": dj_database_url.config(
-        default=os.environ.get("DATABASE_URL")  # pull from env vars
+        default=os.environ.get("DATABASE_URL"),  # pull from env vars
+        conn_max_age=0 if DB_POOL else int(
+            os.environ.get("CONN_MAX_AGE", "600")),
+        conn_health_checks=True,
     )
 }
 
+if DB_POOL and "postgresql" in DATABASES["default"].get("ENGINE", ""):
+    # Limits are per gunicorn worker process (each worker has its own pool)
+    DATABASES["default"].setdefault("OPTIONS", {})["pool"] = {
+        "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", "1")),
+        "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", "4")),
+        "timeout": float(os.environ.get("DB_POOL_TIMEOUT", "10")),
+        "max_idle": float(os.environ.get("DB_POOL_MAX_IDLE", "300")),
+    }
+
+# Cache - used by the API throttles. LocMemCache is per worker process, so
+# set REDIS_URL to share the counters between gunicorn workers / dynos.
+# RedisCache needs the "redis" package (pip install redis) - it is not in
+# requirements.txt, so add it before setting REDIS_URL.
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# API throttling (see crypto/throttling.py)
+# Requests with an X-API-Key header listed in CRYPTO_API_KEYS get the
+# "crypto_key" rate per key, everyone else the "crypto_anon" rate per IP
+CRYPTO_API_KEYS = [
+    key for key in os.environ.get("CRYPTO_API_KEYS", "").split(",") if key
+]
+
+REST_FRAMEWORK = {
+    "DEFAULT_THROTTLE_CLASSES": [
+        "crypto.throttling.CryptoAnonRateThrottle",
+        "crypto.throttling.CryptoKeyRateThrottle",
+    ],
+    "DEFAULT_THROTTLE_RATES": {
+        "crypto_anon": os.environ.get("CRYPTO_ANON_THROTTLE_RATE", "60/min"),
+        "crypto_key": os.environ.get("CRYPTO_KEY_THROTTLE_RATE", "600/min"),
+    },
+    # Number of proxies in front of the app (set NUM_PROXIES=1 on Render).
+    # 0 = ignore X-Forwarded-For and throttle on REMOTE_ADDR. Don't leave it
+    # as None: DRF then uses the whole client-supplied X-Forwarded-For
+    # header as the identity, so clients could rotate it to dodge limits.
+    "NUM_PROXIES": int(os.environ.get("NUM_PROXIES") or 0),
+}
+
+# Price alerts - triggered alerts are POSTed here as JSON by
+# "python manage.py deliver_price_alerts"
+ALERT_WEBHOOK_URL = os.environ.get(
+    "ALERT_WEBHOOK_URL", "http://localhost:8001/alerts/")
+ALERT_WEBHOOK_TIMEOUT = float(os.environ.get("ALERT_WEBHOOK_TIMEOUT", "5"))
+
 # For serving CSS, JavaScript, images that are part of Django (like Django Admin styles)
 # You need this ONLY if you're using Django's admin panel or Django templates
 # Static files (CSS, JavaScript, Images)
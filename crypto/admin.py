@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import CryptoPrice
+from .models import AlertEvent, Candle, CryptoPrice, Holding, PriceAlert
 
 # Register your models here.
 
@@ -7,3 +7,28 @@ from .models import CryptoPrice
 @admin.register(CryptoPrice)
 class CryptoPriceAdmin(admin.ModelAdmin):
     list_display = ('symbol', 'price_usd', 'timestamp')
+
+
+@admin.register(PriceAlert)
+class PriceAlertAdmin(admin.ModelAdmin):
+    list_display = ('user', 'symbol', 'condition', 'threshold', 'is_active',
+                    'triggered_at')
+    list_filter = ('condition', 'is_active')
+
+
+@admin.register(AlertEvent)
+class AlertEventAdmin(admin.ModelAdmin):
+    list_display = ('alert', 'price_usd', 'created_at', 'delivered_at',
+                    'attempts')
+
+
+@admin.register(Holding)
+class HoldingAdmin(admin.ModelAdmin):
+    list_display = ('user', 'symbol', 'quantity', 'updated_at')
+
+
+@admin.register(Candle)
+class CandleAdmin(admin.ModelAdmin):
+    list_display = ('symbol', 'interval', 'open_time', 'open', 'high', 'low',
+                    'close')
+    list_filter = ('interval',)
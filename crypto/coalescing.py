@@ -0,0 +1,74 @@
+import threading
+
+from rest_framework.response import Response
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls that share a key into one execution.
+
+    The first caller for a key runs the function; anyone arriving while it
+    is still running waits and gets the same result (or exception).
+    Once the call finishes the key is forgotten, so this is NOT a cache -
+    it only de-duplicates work that is in flight at the same moment.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+
+# One per worker process - threads in the same worker share it
+request_flight = SingleFlight()
+
+
+class CoalescingMixin:
+    """
+    Computes identical in-flight GET requests once.
+
+    Throttling and auth run in initial() before get(), so every request is
+    still checked individually; only the queryset + serialization is shared.
+    """
+
+    def get(self, request, *args, **kwargs):
+        def compute():
+            response = super(CoalescingMixin, self).get(
+                request, *args, **kwargs)
+            return response.data, response.status_code
+
+        data, status = request_flight.do(
+            ("GET", request.get_full_path()), compute)
+        return Response(data, status=status)
@@ -0,0 +1,68 @@
+from copy import deepcopy
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+
+
+class Command(BaseCommand):
+    help = ("Compare query latency with a fresh DB connection per request "
+            "against a reused (persistent/pooled) connection")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20)
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+
+        # warm up so DNS / first-connect costs don't skew either side
+        self._query(connection)
+
+        fresh = self._run(self._unpooled_connection(), iterations,
+                          reconnect=True)
+        reused = self._run(connection, iterations, reconnect=False)
+
+        self.stdout.write(f"Database: {connection.vendor} "
+                          f"({connection.settings_dict.get('HOST') or 'local'})")
+        self.stdout.write(f"Iterations: {iterations}")
+        self.stdout.write(f"Fresh connection per request: {fresh:8.2f} ms")
+        self.stdout.write(f"Reused connection:            {reused:8.2f} ms")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Connection setup removed per request: {fresh - reused:.2f} ms")
+        )
+
+    def _unpooled_connection(self):
+        # With DB_POOL on, connection.close() only hands the connection back
+        # to the pool, so "fresh" would really be a pool checkout. Use a
+        # separate wrapper without the pool to get a real TCP + TLS connect.
+        wrapper = connections[DEFAULT_DB_ALIAS]
+        settings_dict = deepcopy(wrapper.settings_dict)
+        settings_dict.get("OPTIONS", {}).pop("pool", None)
+        settings_dict["CONN_MAX_AGE"] = 0
+        return wrapper.__class__(settings_dict, alias="bench_unpooled")
+
+    def _run(self, conn, iterations, reconnect):
+        total = 0.0
+        for _ in range(iterations):
+            if reconnect:
+                # what CONN_MAX_AGE=0 does at the end of every request
+                conn.close()
+            start = perf_counter()
+            self._query(conn)
+            total += perf_counter() - start
+        if reconnect:
+            conn.close()
+        return total / iterations * 1000
+
+    def _query(self, conn):
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+
+
+# Run it against the real database, e.g.
+#   DATABASE_URL=postgres://... python manage.py bench_db_connections
+# "Fresh" is the old behaviour (CONN_MAX_AGE=0): every request opens a new
+# TCP + TLS connection. "Reused" is what a worker does now with
+# CONN_MAX_AGE / DB_POOL - the difference is latency we no longer pay.
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from crypto.services.alerts import deliver_pending_alert_events
+
+
+class Command(BaseCommand):
+    help = "Send queued price alert events to the alert webhook"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+
+    def handle(self, *args, **options):
+        self.stdout.write("Delivering price alerts...")
+
+        delivered = deliver_pending_alert_events(options["batch_size"])
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Delivered {delivered} alert event(s).")
+        )
+
+
+# Run this on a schedule (e.g. a Render cron job every minute).
+# Failed deliveries stay queued and are retried up to
+# MAX_DELIVERY_ATTEMPTS times.
@@ -0,0 +1,134 @@
+import os
+import re
+import resource
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# What a gunicorn worker does before serving its first request: load the
+# WSGI app (django.setup()) and resolve the URLconf, which imports views
+BOOT_CODE = (
+    "import config.wsgi\n"
+    "from django.urls import get_resolver\n"
+    "get_resolver().url_patterns\n"
+)
+
+# Modules that should NOT be imported at boot - they load on first use.
+# (requests isn't listed: rest_framework.compat imports it whenever it is
+# installed, so it is always loaded at boot no matter what we do.)
+HEAVY_MODULES = ["pandas", "numpy", "crypto.services.coingecko"]
+
+# "import time:       123 |        456 |     package.module"
+LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+class ImportNode:
+    def __init__(self, name, self_us, cumulative_us):
+        self.name = name
+        self.self_us = self_us
+        self.cumulative_us = cumulative_us
+        self.children = []
+
+
+def parse_importtime(output):
+    """
+    Turn `python -X importtime` stderr into a tree of ImportNodes.
+
+    Python prints a module after everything it imported, indented two
+    spaces per level - so children always show up before their parent.
+    """
+    pending = {}  # depth -> nodes waiting for their parent
+    for line in output.splitlines():
+        match = LINE_RE.match(line)
+        if not match:
+            continue  # header line or unrelated stderr output
+
+        self_us, cumulative_us, indent, name = match.groups()
+        depth = (len(indent) - 1) // 2
+        node = ImportNode(name, int(self_us), int(cumulative_us))
+        node.children = pending.pop(depth + 1, [])
+        pending.setdefault(depth, []).append(node)
+
+    return pending.get(0, [])
+
+
+class Command(BaseCommand):
+    help = ("Profile the imports a web worker does at boot and print them "
+            "as a tree (like python -X importtime), slowest first")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--min-ms", type=float, default=5.0,
+                            help="hide imports faster than this (cumulative)")
+        parser.add_argument("--depth", type=int, default=4,
+                            help="how many levels of the tree to show")
+        parser.add_argument("--top", type=int, default=15,
+                            help="how many modules to list by self time")
+
+    def handle(self, *args, **options):
+        # Fresh interpreter: this process has already imported everything
+        env = dict(os.environ)
+        env.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", BOOT_CODE],
+            cwd=settings.BASE_DIR, env=env,
+            capture_output=True, text=True, check=False,
+        )
+        if result.returncode != 0:
+            self.stderr.write(result.stderr[-2000:])
+            self.stderr.write(self.style.ERROR("Worker boot failed."))
+            return
+
+        roots = parse_importtime(result.stderr)
+        total_ms = sum(node.cumulative_us for node in roots) / 1000
+
+        self.stdout.write("cumulative  self (ms)  module")
+        for node in sorted(roots, key=lambda n: n.cumulative_us,
+                           reverse=True):
+            self._print_node(node, 0, options)
+
+        self.stdout.write("")
+        self.stdout.write(f"Top {options['top']} modules by self time:")
+        for node in sorted(self._walk(roots), key=lambda n: n.self_us,
+                           reverse=True)[:options["top"]]:
+            self.stdout.write(f"{node.self_us / 1000:9.1f} ms  {node.name}")
+
+        imported = {node.name for node in self._walk(roots)}
+        self.stdout.write("")
+        for name in HEAVY_MODULES:
+            state = "LOADED AT BOOT" if name in imported else "lazy"
+            self.stdout.write(f"{name:30} {state}")
+
+        # ru_maxrss is KB on Linux (bytes on macOS)
+        rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        rss_mb = rss / 1024 / (1024 if sys.platform == "darwin" else 1)
+
+        self.stdout.write("")
+        self.stdout.write(
+            self.style.SUCCESS(f"Total import time: {total_ms:.1f} ms, "
+                               f"peak RSS after boot: {rss_mb:.1f} MB")
+        )
+
+    def _print_node(self, node, depth, options):
+        if node.cumulative_us / 1000 < options["min_ms"]:
+            return
+        self.stdout.write(f"{node.cumulative_us / 1000:10.1f} "
+                          f"{node.self_us / 1000:10.1f}  "
+                          f"{'  ' * depth}{node.name}")
+        if depth + 1 >= options["depth"]:
+            return
+        for child in sorted(node.children, key=lambda n: n.cumulative_us,
+                            reverse=True):
+            self._print_node(child, depth + 1, options)
+
+    def _walk(self, nodes):
+        for node in nodes:
+            yield node
+            yield from self._walk(node.children)
+
+
+# Run before and after a change to see what it costs a cold worker:
+#   python manage.py profile_imports --min-ms 10
+# Anything in HEAVY_MODULES showing "LOADED AT BOOT" means some module
+# imported at URL-load time pulls it in at the top level.
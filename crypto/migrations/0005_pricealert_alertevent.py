@@ -0,0 +1,50 @@
+# Generated by Django 6.0.1 on 2026-10-19 10:12
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crypto', '0004_cryptoprice_coingecko_id'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('symbol', models.CharField(max_length=10)),
+                ('condition', models.CharField(choices=[('above', 'Price rises above threshold'), ('below', 'Price falls below threshold'), ('pct_move', 'Price moves by threshold % in either direction')], max_length=10)),
+                ('threshold', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('reference_price', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True)),
+                ('trigger_above', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True)),
+                ('trigger_below', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('triggered_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_alerts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['symbol', 'is_active', 'trigger_above'], name='alert_symbol_above_idx'), models.Index(fields=['symbol', 'is_active', 'trigger_below'], name='alert_symbol_below_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='AlertEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('price_usd', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('delivered_at', models.DateTimeField(blank=True, null=True)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('alert', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='crypto.pricealert')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['delivered_at', 'created_at'], name='alertevent_pending_idx')],
+            },
+        ),
+    ]
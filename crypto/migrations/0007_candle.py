@@ -0,0 +1,31 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crypto', '0006_cryptoprice_price_change_24h_holding'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Candle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('symbol', models.CharField(max_length=10)),
+                ('interval', models.CharField(choices=[('5m', '5 minutes'), ('1h', '1 hour'), ('1d', '1 day')], max_length=3)),
+                ('open_time', models.DateTimeField()),
+                ('open', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('high', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('low', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('close', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('symbol', 'interval', 'open_time'), name='unique_candle_per_bucket')],
+            },
+        ),
+    ]
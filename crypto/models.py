@@ -1,3 +1,5 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils.timezone import now
 # Create your models here.
@@ -11,6 +13,16 @@ class CryptoPrice(models.Model):
     timestamp = models.DateTimeField()
     # New field - can be null for coins we can't map
     coingecko_id = models.CharField(max_length=100, blank=True, null=True)
+    # USD change over the last 24h (from CoinGecko) - used for portfolio P&L
+    price_change_24h = models.DecimalField(max_digits=20, decimal_places=8,
+                                           blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            # portfolio valuation looks up the latest price per symbol
+            models.Index(fields=["symbol", "-timestamp"],
+                         name="cryptoprice_symbol_ts_idx"),
+        ]
 
     def __str__(self):
         return f"{self.symbol} - {self.price_usd}"
@@ -25,3 +37,169 @@ class DataRefreshStatus(models.Model):
 
     def __str__(self):
         return f"Last refresh: {self.last_updated}"
+
+
+class PriceAlert(models.Model):
+    ABOVE = "above"
+    BELOW = "below"
+    PERCENT_MOVE = "pct_move"
+    CONDITION_CHOICES = [
+        (ABOVE, "Price rises above threshold"),
+        (BELOW, "Price falls below threshold"),
+        (PERCENT_MOVE, "Price moves by threshold % in either direction"),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL,
+                             on_delete=models.CASCADE,
+                             related_name="price_alerts")
+    symbol = models.CharField(max_length=10)
+    condition = models.CharField(max_length=10, choices=CONDITION_CHOICES)
+    # a USD price for above/below, a percentage for pct_move
+    threshold = models.DecimalField(max_digits=15, decimal_places=2)
+    # price when the alert was created - pct_move is measured from here, and
+    # above/below must start on the other side of the threshold
+    reference_price = models.DecimalField(max_digits=15, decimal_places=2,
+                                          blank=True, null=True)
+    # Every condition boils down to "price >= X" and/or "price <= Y".
+    # These are worked out once on save so the refresh can find crossed
+    # alerts with an index range scan instead of checking each alert.
+    trigger_above = models.DecimalField(max_digits=15, decimal_places=2,
+                                        blank=True, null=True)
+    trigger_below = models.DecimalField(max_digits=15, decimal_places=2,
+                                        blank=True, null=True)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(default=now)
+    triggered_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            # per-symbol sorted thresholds: (symbol, is_active) narrows to
+            # one symbol's live alerts, the trigger column is kept sorted
+            models.Index(fields=["symbol", "is_active", "trigger_above"],
+                         name="alert_symbol_above_idx"),
+            models.Index(fields=["symbol", "is_active", "trigger_below"],
+                         name="alert_symbol_below_idx"),
+        ]
+
+    def clean(self):
+        if not self.symbol or self.threshold is None:
+            return  # field validation already reports these
+
+        if self.reference_price is None:
+            self.reference_price = self.current_price()
+        if self.reference_price is None:
+            raise ValidationError(
+                {"symbol": "No current price for this symbol."})
+
+        # An alert fires when the price CROSSES its threshold, so one that
+        # is already on the far side would just fire on the next refresh
+        if (self.condition == self.ABOVE
+                and self.reference_price >= self.threshold):
+            raise ValidationError(
+                {"threshold": "Price is already above this threshold."})
+        if (self.condition == self.BELOW
+                and self.reference_price <= self.threshold):
+            raise ValidationError(
+                {"threshold": "Price is already below this threshold."})
+
+    def current_price(self):
+        latest = (CryptoPrice.objects.filter(symbol__iexact=self.symbol)
+                  .order_by("-timestamp").first())
+        return latest.price_usd if latest else None
+
+    def save(self, *args, **kwargs):
+        self.symbol = self.symbol.upper()
+        if self.reference_price is None:
+            self.reference_price = self.current_price()
+        self.trigger_above, self.trigger_below = self.compute_triggers()
+        super().save(*args, **kwargs)
+
+    def compute_triggers(self):
+        if self.condition == self.ABOVE:
+            return self.threshold, None
+        if self.condition == self.BELOW:
+            return None, self.threshold
+        if self.reference_price is None:
+            # nothing to measure the move from - stays dormant, clean()
+            # stops this from happening through the API / admin
+            return None, None
+        # pct_move: threshold % either side of the reference price
+        move = self.reference_price * self.threshold / 100
+        return self.reference_price + move, self.reference_price - move
+
+    def __str__(self):
+        return f"{self.symbol} {self.condition} {self.threshold}"
+
+
+# Triggered alerts are queued here and delivered to the webhook separately
+# (python manage.py deliver_price_alerts), so a slow or down webhook
+# endpoint never holds up a price refresh.
+
+
+class AlertEvent(models.Model):
+    alert = models.ForeignKey(PriceAlert, on_delete=models.CASCADE,
+                              related_name="events")
+    price_usd = models.DecimalField(max_digits=15, decimal_places=2)
+    created_at = models.DateTimeField(default=now)
+    delivered_at = models.DateTimeField(blank=True, null=True)
+    attempts = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["delivered_at", "created_at"],
+                         name="alertevent_pending_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.alert} @ {self.price_usd}"
+
+
+class Holding(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL,
+                             on_delete=models.CASCADE,
+                             related_name="holdings")
+    symbol = models.CharField(max_length=10)
+    quantity = models.DecimalField(max_digits=30, decimal_places=10)
+    # bumped on every change - part of the portfolio valuation cache key
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "symbol"],
+                                    name="unique_holding_per_symbol"),
+        ]
+
+    def save(self, *args, **kwargs):
+        # CryptoPrice symbols are stored upper case - keep the join exact
+        self.symbol = self.symbol.upper()
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.user} - {self.quantity} {self.symbol}"
+
+
+class Candle(models.Model):
+    INTERVAL_CHOICES = [
+        ("5m", "5 minutes"),
+        ("1h", "1 hour"),
+        ("1d", "1 day"),
+    ]
+
+    symbol = models.CharField(max_length=10)
+    interval = models.CharField(max_length=3, choices=INTERVAL_CHOICES)
+    open_time = models.DateTimeField()  # start of the bucket
+    open = models.DecimalField(max_digits=15, decimal_places=2)
+    high = models.DecimalField(max_digits=15, decimal_places=2)
+    low = models.DecimalField(max_digits=15, decimal_places=2)
+    close = models.DecimalField(max_digits=15, decimal_places=2)
+    updated_at = models.DateTimeField(default=now)
+
+    class Meta:
+        constraints = [
+            # also the index behind /<symbol>/candles/ range queries
+            models.UniqueConstraint(fields=["symbol", "interval", "open_time"],
+                                    name="unique_candle_per_bucket"),
+        ]
+
+    def __str__(self):
+        return f"{self.symbol} {self.interval} @ {self.open_time}"
@@ -1,5 +1,6 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
-from .models import CryptoPrice
+from .models import Candle, CryptoPrice, Holding, PriceAlert
 
 
 class CryptoPriceSerializer(serializers.ModelSerializer):
@@ -12,6 +13,76 @@ class CryptoPriceSerializer(serializers.ModelSerializer):
             "price_usd",
             "market_cap",
             "timestamp",
-            "coingecko_id"
+            "coingecko_id",
+            "price_change_24h"
         ]
 # Serializer = JSON schema + validation.
+
+
+class PriceAlertSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PriceAlert
+        fields = [
+            "id",
+            "symbol",
+            "condition",
+            "threshold",
+            "reference_price",
+            "is_active",
+            "created_at",
+            "triggered_at",
+        ]
+        read_only_fields = [
+            "reference_price",
+            "is_active",
+            "created_at",
+            "triggered_at",
+        ]
+
+    def validate_symbol(self, value):
+        return value.upper()
+
+    def validate_threshold(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("Threshold must be positive.")
+        return value
+
+    def validate(self, attrs):
+        # Model.clean() records the current price as reference_price and
+        # rejects thresholds the price has already crossed
+        alert = PriceAlert(**attrs)
+        try:
+            alert.clean()
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError(exc.message_dict) from exc
+        attrs["reference_price"] = alert.reference_price
+        return attrs
+
+
+class HoldingSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Holding
+        fields = ["id", "symbol", "quantity", "updated_at"]
+        read_only_fields = ["updated_at"]
+
+    def validate_symbol(self, value):
+        value = value.upper()
+        user = self.context["request"].user
+        holdings = Holding.objects.filter(user=user, symbol=value)
+        if self.instance is not None:
+            holdings = holdings.exclude(pk=self.instance.pk)
+        if holdings.exists():
+            raise serializers.ValidationError(
+                "You already hold this symbol - update that holding instead.")
+        return value
+
+    def validate_quantity(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("Quantity must be positive.")
+        return value
+
+
+class CandleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Candle
+        fields = ["open_time", "open", "high", "low", "close"]
@@ -1 +1,9 @@
-from .coingecko import fetch_and_store_crypto_prices
+# Re-exports are resolved lazily (PEP 562) - importing crypto.services or
+# any submodule must not drag in the CoinGecko client and pandas.
+
+
+def __getattr__(name):
+    if name == "fetch_and_store_crypto_prices":
+        from .coingecko import fetch_and_store_crypto_prices
+        return fetch_and_store_crypto_prices
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
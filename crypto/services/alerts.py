@@ -0,0 +1,103 @@
+from decimal import Decimal
+
+import requests
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils.timezone import now
+
+from crypto.models import AlertEvent, PriceAlert
+
+MAX_DELIVERY_ATTEMPTS = 5
+
+
+def evaluate_price_alerts(prices):
+    """
+    Trigger every active alert crossed by the latest prices.
+
+    prices is {symbol: price}. Instead of loading and checking all alerts,
+    each symbol becomes two range conditions (trigger_above <= price,
+    trigger_below >= price) which the database answers from the sorted
+    per-symbol indexes on PriceAlert - O(log n + k) per symbol, where k is
+    the number of alerts actually crossed. All symbols go in one query.
+
+    Alerts are created on the near side of their threshold (see
+    PriceAlert.clean) and switched off once fired, so a match here is
+    always a crossing since the alert was set, never a stale condition.
+    """
+    if not prices:
+        return 0
+
+    crossed = Q()
+    for symbol, price in prices.items():
+        price = Decimal(str(price))
+        crossed |= Q(symbol=symbol, trigger_above__lte=price)
+        crossed |= Q(symbol=symbol, trigger_below__gte=price)
+
+    timestamp = now()
+    with transaction.atomic():
+        # Lock the crossed rows: a concurrent refresh (cron + web worker)
+        # skips them instead of queueing the same events a second time
+        alerts = list(
+            PriceAlert.objects.select_for_update(skip_locked=True)
+            .filter(crossed, is_active=True)
+            .only("id", "symbol")
+        )
+        if not alerts:
+            return 0
+
+        AlertEvent.objects.bulk_create([
+            AlertEvent(alert=alert,
+                       price_usd=Decimal(str(prices[alert.symbol])),
+                       created_at=timestamp)
+            for alert in alerts
+        ])
+        # one-shot alerts: switch off so they don't fire on every refresh
+        PriceAlert.objects.filter(
+            id__in=[alert.id for alert in alerts], is_active=True
+        ).update(is_active=False, triggered_at=timestamp)
+
+    return len(alerts)
+
+
+def deliver_pending_alert_events(batch_size=100):
+    """POST queued alert events to ALERT_WEBHOOK_URL, oldest first."""
+    delivered = 0
+    # The batch stays row-locked until it has been sent, so an overlapping
+    # run of the command skips these events instead of POSTing them twice
+    with transaction.atomic(), requests.Session() as session:
+        pending = (
+            AlertEvent.objects
+            .select_for_update(skip_locked=True, of=("self",))
+            .filter(delivered_at__isnull=True,
+                    attempts__lt=MAX_DELIVERY_ATTEMPTS)
+            .select_related("alert")
+            .order_by("created_at")[:batch_size]
+        )
+
+        for event in pending:
+            alert = event.alert
+            payload = {
+                "alert_id": alert.id,
+                "user_id": alert.user_id,
+                "symbol": alert.symbol,
+                "condition": alert.condition,
+                "threshold": str(alert.threshold),
+                "price_usd": str(event.price_usd),
+                "triggered_at": event.created_at.isoformat(),
+            }
+
+            event.attempts += 1
+            try:
+                response = session.post(settings.ALERT_WEBHOOK_URL,
+                                        json=payload,
+                                        timeout=settings.ALERT_WEBHOOK_TIMEOUT)
+                response.raise_for_status()
+                event.delivered_at = now()
+                delivered += 1
+            except requests.exceptions.RequestException as e:
+                print(f"Alert webhook delivery failed: {e}")
+
+            event.save(update_fields=["attempts", "delivered_at"])
+
+    return delivered
@@ -0,0 +1,71 @@
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Q
+
+from crypto.models import Candle
+
+# seconds per candle for each supported interval
+INTERVALS = {
+    "5m": 5 * 60,
+    "1h": 60 * 60,
+    "1d": 24 * 60 * 60,
+}
+
+
+def bucket_start(timestamp, interval):
+    seconds = INTERVALS[interval]
+    epoch = int(timestamp.timestamp()) // seconds * seconds
+    return datetime.fromtimestamp(epoch, tz=dt_timezone.utc)
+
+
+def update_candles(prices, timestamp):
+    """
+    Fold one price snapshot into the open candle of every interval.
+
+    prices is {symbol: price}. Only the candles containing `timestamp` are
+    touched - one read and at most two bulk writes for the whole snapshot,
+    so the cost is O(symbols), never a recompute over old ticks (which the
+    refresh deletes anyway).
+    """
+    if not prices:
+        return
+
+    buckets = {interval: bucket_start(timestamp, interval)
+               for interval in INTERVALS}
+
+    current = Q()
+    for interval, open_time in buckets.items():
+        current |= Q(interval=interval, open_time=open_time)
+
+    with transaction.atomic():
+        existing = {
+            (c.symbol, c.interval): c
+            for c in Candle.objects.select_for_update().filter(
+                current, symbol__in=list(prices))
+        }
+
+        to_create, to_update = [], []
+        for symbol, price in prices.items():
+            price = Decimal(str(price)).quantize(Decimal("0.01"))
+            for interval, open_time in buckets.items():
+                candle = existing.get((symbol, interval))
+                if candle is None:
+                    to_create.append(Candle(
+                        symbol=symbol, interval=interval, open_time=open_time,
+                        open=price, high=price, low=price, close=price,
+                        updated_at=timestamp))
+                    continue
+
+                candle.high = max(candle.high, price)
+                candle.low = min(candle.low, price)
+                candle.close = price
+                candle.updated_at = timestamp
+                to_update.append(candle)
+
+        # ignore_conflicts: a concurrent refresh (cron + web) may have just
+        # opened the same candle - theirs wins, ours shows up next tick
+        Candle.objects.bulk_create(to_create, ignore_conflicts=True)
+        Candle.objects.bulk_update(
+            to_update, ["high", "low", "close", "updated_at"])
@@ -1,7 +1,8 @@
 import os
 import requests
-import pandas as pd
 from crypto.models import CryptoPrice
+from crypto.services.alerts import evaluate_price_alerts
+from crypto.services.candles import update_candles
 from django.utils import timezone
 
 
@@ -67,11 +68,16 @@ class CoinGeckoCache:
         return None
 
 
-# Singleton instance
-coin_cache = CoinGeckoCache()
+# No module-level singleton instance: CoinGeckoCache() always returns the
+# same object anyway, so it is created on the first fetch instead of when
+# a worker imports this module.
 
 
 def fetch_and_store_crypto_prices():
+    # pandas (and numpy under it) is a large share of worker boot time, and
+    # most requests never refresh - so only pay for it when we actually
+    # fetch (python manage.py profile_imports shows the difference)
+    import pandas as pd
 
     # Load from environment (fail early if missing)
     COINGECKO_API_KEY = os.environ.get('COINGECKO_API_KEY')
@@ -122,7 +128,8 @@ def fetch_and_store_crypto_prices():
         "symbol",
         "name",
         "current_price",
-        "market_cap"
+        "market_cap",
+        "price_change_24h"
     ]]
 
     # 🧹 Rename columns
@@ -149,7 +156,7 @@ def fetch_and_store_crypto_prices():
     # index=False: Excludes the row index from the tuple
     crypto_objects = []
     for row in df.itertuples(index=False):
-        cg_id = coin_cache.get_coingecko_id(row.symbol, row.name)
+        cg_id = CoinGeckoCache().get_coingecko_id(row.symbol, row.name)
         crypto_objects.append(
             CryptoPrice(
                 symbol=row.symbol.upper(),
@@ -157,8 +164,19 @@ def fetch_and_store_crypto_prices():
                 price_usd=row.price_usd,
                 market_cap=row.market_cap,
                 timestamp=timestamp,
-                coingecko_id=cg_id  # ← Save it!
+                coingecko_id=cg_id,  # ← Save it!
+                # NaN when CoinGecko has no 24h data for the coin
+                price_change_24h=(None if pd.isna(row.price_change_24h)
+                                  else row.price_change_24h)
             )
         )
 
     CryptoPrice.objects.bulk_create(crypto_objects)
+
+    prices = {obj.symbol: obj.price_usd for obj in crypto_objects}
+
+    # Keep OHLC candles - the rows above are wiped on the next refresh
+    update_candles(prices, timestamp)
+
+    # Fire any price alerts crossed by this snapshot (queued, not sent here)
+    evaluate_price_alerts(prices)
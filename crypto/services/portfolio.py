@@ -0,0 +1,100 @@
+from django.core.cache import cache
+from django.db.models import Count, Max, OuterRef, Subquery
+
+from crypto.models import CryptoPrice, Holding
+
+CACHE_TIMEOUT = 60 * 60  # a new snapshot changes the key long before this
+
+
+def _cache_key(user):
+    # Valuation only changes when the price snapshot or the holdings change,
+    # so both are part of the key. These two aggregates are far cheaper than
+    # the valuation itself.
+    snapshot = CryptoPrice.objects.aggregate(ts=Max("timestamp"))["ts"]
+    holdings = Holding.objects.filter(user=user).aggregate(
+        n=Count("id"), ts=Max("updated_at"))
+    return "portfolio:{}:{}:{}:{}".format(
+        user.pk,
+        snapshot.timestamp() if snapshot else 0,
+        holdings["n"],
+        holdings["ts"].timestamp() if holdings["ts"] else 0,
+    )
+
+
+def _priced_holdings(user):
+    # Correlated subqueries = one SQL statement; each one is an index lookup
+    # on cryptoprice_symbol_ts_idx (symbol, -timestamp)
+    latest = CryptoPrice.objects.filter(
+        symbol=OuterRef("symbol")).order_by("-timestamp")
+
+    return list(
+        Holding.objects.filter(user=user)
+        .annotate(
+            name=Subquery(latest.values("name")[:1]),
+            price_usd=Subquery(latest.values("price_usd")[:1]),
+            price_change_24h=Subquery(latest.values("price_change_24h")[:1]),
+        )
+        .order_by("symbol")
+        .values("symbol", "name", "quantity", "price_usd", "price_change_24h")
+    )
+
+
+def value_portfolio(user):
+    """
+    Value all of a user's holdings against the current price snapshot.
+
+    Returns totals, per-holding allocation % and 24h P&L. Results are cached
+    until the next refresh or the next change to the user's holdings.
+    Holdings whose symbol is not in the snapshot are listed with null prices
+    and left out of the totals.
+    """
+    key = _cache_key(user)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    import pandas as pd  # lazy: keeps pandas out of worker boot
+
+    df = pd.DataFrame.from_records(
+        _priced_holdings(user),
+        columns=["symbol", "name", "quantity", "price_usd",
+                 "price_change_24h"],
+    )
+
+    # Decimal / None -> float / NaN so the maths below runs column-wise
+    quantity = df["quantity"].astype(float)
+    price = pd.to_numeric(df["price_usd"], errors="coerce")
+    change = pd.to_numeric(df["price_change_24h"], errors="coerce")
+
+    df["quantity"] = quantity
+    df["price_usd"] = price
+    df["value_usd"] = quantity * price
+    df["pnl_24h_usd"] = quantity * change
+
+    total = df["value_usd"].sum()  # NaN (unpriced) is skipped
+    pnl = df["pnl_24h_usd"].sum()
+    # NaN (-> null) when nothing is priced, same as unpriced rows normally
+    df["allocation_pct"] = (df["value_usd"] / total * 100 if total
+                            else float("nan"))
+
+    # % P&L only over holdings with both a price and a 24h change -
+    # otherwise a coin missing its change would count as "flat" in the base
+    with_change = df["value_usd"].notna() & change.notna()
+    value_24h_ago = df.loc[with_change, "value_usd"].sum() - pnl
+    holdings = (
+        df[["symbol", "name", "quantity", "price_usd", "value_usd",
+            "allocation_pct", "pnl_24h_usd"]]
+        .round({"value_usd": 2, "allocation_pct": 2, "pnl_24h_usd": 2})
+    )
+    result = {
+        "total_value_usd": round(float(total), 2),
+        "pnl_24h_usd": round(float(pnl), 2),
+        "pnl_24h_pct": (round(float(pnl / value_24h_ago * 100), 2)
+                        if value_24h_ago else None),
+        # NaN is not valid JSON - unpriced holdings get None instead
+        "holdings": holdings.astype(object).where(holdings.notna(), None)
+        .to_dict(orient="records"),
+    }
+
+    cache.set(key, result, CACHE_TIMEOUT)
+    return result
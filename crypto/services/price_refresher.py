@@ -1,12 +1,24 @@
 from datetime import timedelta
 
+from django.core.cache import cache
 from django.utils.timezone import now
 
+from crypto.coalescing import SingleFlight
 from crypto.models import DataRefreshStatus
-from crypto.services.coingecko import fetch_and_store_crypto_prices
 
 STALE_AFTER = timedelta(minutes=5)
 
+# Cross-process lock so only one gunicorn worker calls CoinGecko per stale
+# period. It lives in the default cache, so it is only shared between
+# workers when REDIS_URL is set - with LocMemCache each worker has its own
+# lock. The timeout frees it if a worker dies mid-fetch.
+REFRESH_LOCK_KEY = "crypto:refresh-lock"
+REFRESH_LOCK_TIMEOUT = 60  # seconds, > the 30s CoinGecko request timeout
+
+# Same idea within one process, for threaded workers (gunicorn --threads):
+# threads waiting here get the leader's result instead of returning early
+_refresh_flight = SingleFlight()
+
 
 def refresh_prices_if_stale():
     status, _ = DataRefreshStatus.objects.get_or_create(id=1)
@@ -14,10 +26,32 @@ def refresh_prices_if_stale():
     if now() - status.last_updated < STALE_AFTER:
         return False  # still fresh
 
-    fetch_and_store_crypto_prices()
+    return _refresh_flight.do("refresh", _refresh)
+
+
+def _refresh():
+    # imported here so views don't load the CoinGecko client until the
+    # first time data actually goes stale
+    from crypto.services.coingecko import fetch_and_store_crypto_prices
+
+    # add() only succeeds if nobody holds the lock - whoever loses just
+    # serves the current (slightly stale) data instead of fetching again
+    if not cache.add(REFRESH_LOCK_KEY, "1", REFRESH_LOCK_TIMEOUT):
+        return False
+
+    try:
+        # Re-check: another worker may have finished a refresh since we
+        # looked at the status
+        status, _ = DataRefreshStatus.objects.get_or_create(id=1)
+        if now() - status.last_updated < STALE_AFTER:
+            return False
+
+        fetch_and_store_crypto_prices()
 
-    status.last_updated = now()
-    status.save()
+        status.last_updated = now()
+        status.save()
+    finally:
+        cache.delete(REFRESH_LOCK_KEY)
 
     return True  # refreshed
 
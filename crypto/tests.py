@@ -1,3 +1,548 @@
-from django.test import TestCase
+import json
+import os
+import subprocess
+import sys
+import threading
+import warnings
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
+
+import requests
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.test import RequestFactory, TestCase
+from django.utils.timezone import now
+
+from crypto.coalescing import SingleFlight, request_flight
+from crypto.management.commands.profile_imports import (BOOT_CODE,
+                                                        HEAVY_MODULES,
+                                                        parse_importtime)
+from crypto.models import (AlertEvent, Candle, CryptoPrice,
+                           DataRefreshStatus, Holding, PriceAlert)
+from crypto.services.alerts import (MAX_DELIVERY_ATTEMPTS,
+                                    deliver_pending_alert_events,
+                                    evaluate_price_alerts)
+from crypto.services.candles import bucket_start, update_candles
+from crypto.services.portfolio import _cache_key, value_portfolio
+from crypto.services.price_refresher import (REFRESH_LOCK_KEY,
+                                             refresh_prices_if_stale)
+from crypto.throttling import CryptoAnonRateThrottle
+from crypto.views import CryptoPriceListView
 
 # Create your tests here.
+
+
+class SlidingWindowThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def make_throttle(self, at):
+        throttle = CryptoAnonRateThrottle()
+        throttle.timer = lambda: at
+        return throttle
+
+    def allow(self, at):
+        request = RequestFactory().get("/", REMOTE_ADDR="10.0.0.1")
+        throttle = self.make_throttle(at)
+        return throttle.allow_request(request, None), throttle
+
+    @mock.patch.object(CryptoAnonRateThrottle, "rate", "3/min", create=True)
+    def test_returns_429_after_limit(self):
+        for _ in range(3):
+            response = self.client.get("/api/crypto/refresh-status/")
+            self.assertEqual(response.status_code, 200)
+
+        response = self.client.get("/api/crypto/refresh-status/")
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response.headers)
+
+    @mock.patch.object(CryptoAnonRateThrottle, "rate", "3/min", create=True)
+    def test_rotating_x_forwarded_for_does_not_dodge_limit(self):
+        statuses = [
+            self.client.get("/api/crypto/refresh-status/",
+                            HTTP_X_FORWARDED_FOR=f"203.0.113.{i}").status_code
+            for i in range(5)
+        ]
+
+        self.assertEqual(statuses, [200, 200, 200, 429, 429])
+
+    @mock.patch.object(CryptoAnonRateThrottle, "rate", "3/min", create=True)
+    def test_wait_until_next_window_when_current_is_full(self):
+        window_start = 600 * 60.0
+        for _ in range(3):
+            allowed, _ = self.allow(window_start + 10)
+            self.assertTrue(allowed)
+
+        allowed, throttle = self.allow(window_start + 30)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(throttle.wait(), 30)
+
+    @mock.patch.object(CryptoAnonRateThrottle, "rate", "3/min", create=True)
+    def test_previous_window_is_weighted_by_overlap(self):
+        window_start = 600 * 60.0
+        for _ in range(3):
+            self.allow(window_start - 10)  # previous window, now full
+
+        # 15s in: previous counts 3 * 0.75 = 2.25, so one more fits
+        allowed, _ = self.allow(window_start + 15)
+        self.assertTrue(allowed)
+
+        # 2.25 + 1 >= 3 - allowed again once previous weighs < 2 (t=20s)
+        allowed, throttle = self.allow(window_start + 15)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(throttle.wait(), 5)
+
+
+class _CountingEvent(threading.Event):
+    """Event that records how many threads are blocked in wait()."""
+
+    def __init__(self):
+        super().__init__()
+        self.waiting = 0
+
+    def wait(self, timeout=None):
+        self.waiting += 1
+        return super().wait(timeout)
+
+
+class SingleFlightTests(TestCase):
+    def run_concurrently(self, flight, fn, followers=3):
+        started = threading.Event()
+        release = threading.Event()
+        results = []
+
+        def leader_fn():
+            started.set()
+            release.wait(5)
+            return fn()
+
+        def call(target):
+            try:
+                results.append(("ok", flight.do("key", target)))
+            except Exception as exc:  # pylint: disable=broad-except
+                results.append(("error", exc))
+
+        threads = [threading.Thread(target=call, args=(leader_fn,))]
+        threads[0].start()
+        started.wait(5)
+
+        # swap in an event we can observe, then let followers pile up on it
+        in_flight = flight._calls["key"]
+        in_flight.done = _CountingEvent()
+        for _ in range(followers):
+            thread = threading.Thread(
+                target=call, args=(lambda: "follower ran",))
+            thread.start()
+            threads.append(thread)
+        while in_flight.done.waiting < followers:
+            threading.Event().wait(0.001)
+
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        return results
+
+    def test_followers_get_leader_result(self):
+        flight = SingleFlight()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return 42
+
+        results = self.run_concurrently(flight, compute)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [("ok", 42)] * 4)
+        self.assertEqual(flight._calls, {})
+
+    def test_followers_get_leader_exception(self):
+        flight = SingleFlight()
+
+        def compute():
+            raise RuntimeError("upstream down")
+
+        results = self.run_concurrently(flight, compute)
+
+        self.assertEqual(len(results), 4)
+        for kind, value in results:
+            self.assertEqual(kind, "error")
+            self.assertIsInstance(value, RuntimeError)
+        self.assertEqual(flight._calls, {})
+
+
+class CoalescingMixinTests(TestCase):
+    def setUp(self):
+        cache.clear()  # throttle counters
+
+    def test_concurrent_identical_requests_evaluate_queryset_once(self):
+        view = CryptoPriceListView.as_view()
+        leader_inside = threading.Event()
+        evaluated = []
+        responses = []
+
+        def get_queryset(_view):
+            evaluated.append(1)
+            # hold the leader until the follower is waiting on its result
+            in_flight = request_flight._calls[("GET", "/api/crypto/prices/")]
+            in_flight.done = _CountingEvent()
+            leader_inside.set()
+            while in_flight.done.waiting < 1:
+                threading.Event().wait(0.001)
+            return [CryptoPrice(symbol="BTC", name="Bitcoin",
+                                price_usd=Decimal("60000"), market_cap=1,
+                                timestamp=now())]
+
+        def call():
+            request = RequestFactory().get("/api/crypto/prices/")
+            responses.append(view(request).render())
+
+        with mock.patch.object(CryptoPriceListView, "get_queryset",
+                               get_queryset):
+            leader = threading.Thread(target=call)
+            leader.start()
+            leader_inside.wait(5)
+            follower = threading.Thread(target=call)
+            follower.start()
+            leader.join(5)
+            follower.join(5)
+
+        self.assertEqual(len(evaluated), 1)
+        self.assertEqual([r.status_code for r in responses], [200, 200])
+        self.assertEqual(responses[0].content, responses[1].content)
+
+
+@mock.patch("crypto.services.coingecko.fetch_and_store_crypto_prices")
+class RefreshLockTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        DataRefreshStatus.objects.create(
+            id=1, last_updated=now() - timedelta(minutes=10))
+
+    def test_stale_data_is_fetched_once_and_lock_released(self, fetch):
+        self.assertTrue(refresh_prices_if_stale())
+        self.assertFalse(refresh_prices_if_stale())  # fresh now
+
+        fetch.assert_called_once()
+        self.assertIsNone(cache.get(REFRESH_LOCK_KEY))
+
+    def test_skips_fetch_while_another_worker_holds_lock(self, fetch):
+        cache.add(REFRESH_LOCK_KEY, "1", 60)
+
+        self.assertFalse(refresh_prices_if_stale())
+        fetch.assert_not_called()
+
+
+def make_price(symbol, price, change=None, timestamp=None):
+    return CryptoPrice.objects.create(
+        symbol=symbol, name=symbol.title(), price_usd=Decimal(price),
+        market_cap=1, timestamp=timestamp or now(),
+        price_change_24h=change)
+
+
+class PriceAlertTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("alice", "", "pw")
+        make_price("BTC", "60000")
+
+    def alert(self, condition, threshold, symbol="BTC"):
+        alert = PriceAlert(user=self.user, symbol=symbol,
+                           condition=condition, threshold=Decimal(threshold))
+        alert.full_clean()
+        alert.save()
+        return alert
+
+    def test_only_crossed_alerts_are_triggered_and_deactivated(self):
+        above_hit = self.alert(PriceAlert.ABOVE, "61000")
+        above_miss = self.alert(PriceAlert.ABOVE, "70000")
+        below_hit = self.alert(PriceAlert.BELOW, "59000")
+        below_miss = self.alert(PriceAlert.BELOW, "50000")
+        move = self.alert(PriceAlert.PERCENT_MOVE, "5")  # 57000 / 63000
+
+        self.assertEqual(evaluate_price_alerts({"BTC": 62000}), 1)
+        self.assertEqual(evaluate_price_alerts({"BTC": 58000}), 1)
+        self.assertEqual(evaluate_price_alerts({"BTC": 63500}), 1)
+        # fired alerts are off - crossing again does nothing
+        self.assertEqual(evaluate_price_alerts({"BTC": 64000}), 0)
+
+        for alert in (above_hit, below_hit, move):
+            alert.refresh_from_db()
+            self.assertFalse(alert.is_active)
+            self.assertIsNotNone(alert.triggered_at)
+            self.assertEqual(alert.events.count(), 1)
+        for alert in (above_miss, below_miss):
+            alert.refresh_from_db()
+            self.assertTrue(alert.is_active)
+        self.assertEqual(AlertEvent.objects.count(), 3)
+
+    def test_other_symbols_are_not_touched(self):
+        make_price("ETH", "3000")
+        self.alert(PriceAlert.ABOVE, "3100", symbol="ETH")
+
+        self.assertEqual(evaluate_price_alerts({"BTC": 99999}), 0)
+
+    def test_already_crossed_threshold_is_rejected(self):
+        with self.assertRaises(ValidationError):
+            self.alert(PriceAlert.ABOVE, "59000")
+        with self.assertRaises(ValidationError):
+            self.alert(PriceAlert.BELOW, "61000")
+
+    def test_reference_price_is_stored_for_every_condition(self):
+        alert = self.alert(PriceAlert.ABOVE, "65000")
+        self.assertEqual(alert.reference_price, Decimal("60000"))
+
+    def test_pct_move_without_price_saves_without_triggers(self):
+        alert = PriceAlert(user=self.user, symbol="DOGE",
+                           condition=PriceAlert.PERCENT_MOVE,
+                           threshold=Decimal("5"))
+        alert.save()
+
+        self.assertIsNone(alert.trigger_above)
+        self.assertIsNone(alert.trigger_below)
+        with self.assertRaises(ValidationError):
+            alert.full_clean()
+
+    def test_api_rejects_crossed_threshold(self):
+        self.client.force_login(self.user)
+        response = self.client.post(
+            "/api/crypto/alerts/",
+            {"symbol": "btc", "condition": "above", "threshold": "59000"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("threshold", response.json())
+
+
+@mock.patch("requests.Session.post")
+class AlertDeliveryTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user("carol", "", "pw")
+        make_price("BTC", "60000")
+        self.alert = PriceAlert.objects.create(
+            user=user, symbol="BTC", condition=PriceAlert.ABOVE,
+            threshold=Decimal("61000"))
+        self.event = AlertEvent.objects.create(alert=self.alert,
+                                               price_usd=Decimal("61500"))
+
+    def test_success_marks_event_delivered(self, post):
+        post.return_value.raise_for_status.return_value = None
+
+        self.assertEqual(deliver_pending_alert_events(), 1)
+
+        self.event.refresh_from_db()
+        self.assertIsNotNone(self.event.delivered_at)
+        self.assertEqual(self.event.attempts, 1)
+        payload = post.call_args.kwargs["json"]
+        self.assertEqual(payload["alert_id"], self.alert.id)
+        self.assertEqual(payload["price_usd"], "61500.00")
+
+    def test_failure_keeps_event_queued(self, post):
+        post.side_effect = requests.exceptions.ConnectionError("down")
+
+        self.assertEqual(deliver_pending_alert_events(), 0)
+        self.assertEqual(deliver_pending_alert_events(), 0)
+
+        self.event.refresh_from_db()
+        self.assertIsNone(self.event.delivered_at)
+        self.assertEqual(self.event.attempts, 2)
+
+    def test_events_past_max_attempts_are_not_retried(self, post):
+        self.event.attempts = MAX_DELIVERY_ATTEMPTS
+        self.event.save()
+
+        self.assertEqual(deliver_pending_alert_events(), 0)
+        post.assert_not_called()
+
+    def test_delivered_events_are_not_sent_again(self, post):
+        post.return_value.raise_for_status.return_value = None
+
+        deliver_pending_alert_events()
+        deliver_pending_alert_events()
+
+        post.assert_called_once()
+
+
+class PortfolioValuationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user("bob", "", "pw")
+        make_price("BTC", "60000", change=Decimal("1000"))
+        make_price("ETH", "3000")  # no 24h change
+        Holding.objects.create(user=self.user, symbol="btc",
+                               quantity=Decimal("0.5"))
+        Holding.objects.create(user=self.user, symbol="ETH",
+                               quantity=Decimal("10"))
+        Holding.objects.create(user=self.user, symbol="XYZ",
+                               quantity=Decimal("100"))  # not in snapshot
+
+    def test_totals_allocation_and_unpriced_holdings(self):
+        result = value_portfolio(self.user)
+        holdings = {h["symbol"]: h for h in result["holdings"]}
+
+        self.assertEqual(result["total_value_usd"], 60000.0)
+        self.assertEqual(holdings["BTC"]["allocation_pct"], 50.0)
+        self.assertEqual(holdings["ETH"]["value_usd"], 30000.0)
+        self.assertIsNone(holdings["XYZ"]["price_usd"])
+        self.assertIsNone(holdings["XYZ"]["value_usd"])
+        self.assertIsNone(holdings["XYZ"]["allocation_pct"])
+
+    def test_nothing_priced_gives_null_allocation(self):
+        other = get_user_model().objects.create_user("dave", "", "pw")
+        Holding.objects.create(user=other, symbol="XYZ", quantity=1)
+
+        result = value_portfolio(other)
+
+        self.assertEqual(result["total_value_usd"], 0.0)
+        self.assertIsNone(result["pnl_24h_pct"])
+        self.assertIsNone(result["holdings"][0]["allocation_pct"])
+
+    def test_pnl_pct_ignores_holdings_without_change(self):
+        result = value_portfolio(self.user)
+
+        self.assertEqual(result["pnl_24h_usd"], 500.0)
+        # BTC was worth 29500 a day ago: 500 / 29500, ETH left out
+        self.assertEqual(result["pnl_24h_pct"], 1.69)
+
+    def test_cache_key_changes_after_holding_update(self):
+        first = value_portfolio(self.user)
+        key = _cache_key(self.user)
+
+        holding = Holding.objects.get(user=self.user, symbol="BTC")
+        holding.quantity = Decimal("1")
+        holding.save()
+
+        self.assertNotEqual(_cache_key(self.user), key)
+        self.assertEqual(value_portfolio(self.user)["total_value_usd"],
+                         90000.0)
+        self.assertEqual(first["total_value_usd"], 60000.0)
+
+    def test_repeated_reads_are_served_from_cache(self):
+        value_portfolio(self.user)
+        with mock.patch("crypto.services.portfolio._priced_holdings") as q:
+            value_portfolio(self.user)
+        q.assert_not_called()
+
+
+class CandleAggregationTests(TestCase):
+    # 10:01 UTC - the 5m, 1h and 1d buckets are all open
+    start = datetime(2026, 10, 19, 10, 1, tzinfo=dt_timezone.utc)
+
+    def test_ohlc_across_refreshes_in_one_bucket(self):
+        for minute, price in enumerate(["100", "120", "90", "110"]):
+            update_candles({"BTC": Decimal(price)},
+                           self.start + timedelta(minutes=minute))
+
+        for interval in ("5m", "1h", "1d"):
+            candle = Candle.objects.get(symbol="BTC", interval=interval)
+            self.assertEqual(candle.open_time,
+                             bucket_start(self.start, interval))
+            self.assertEqual(
+                (candle.open, candle.high, candle.low, candle.close),
+                (Decimal("100"), Decimal("120"), Decimal("90"),
+                 Decimal("110")))
+
+    def test_new_bucket_opens_a_new_candle(self):
+        update_candles({"BTC": 100}, self.start)
+        update_candles({"BTC": 130}, self.start + timedelta(minutes=5))
+
+        five_minute = Candle.objects.filter(
+            symbol="BTC", interval="5m").order_by("open_time")
+        self.assertEqual([c.close for c in five_minute],
+                         [Decimal("100"), Decimal("130")])
+        hourly = Candle.objects.get(symbol="BTC", interval="1h")
+        self.assertEqual((hourly.open, hourly.close),
+                         (Decimal("100"), Decimal("130")))
+
+
+@mock.patch("crypto.views.refresh_prices_if_stale")
+class CandleEndpointTests(TestCase):
+    url = "/api/crypto/btc/candles/"
+
+    def setUp(self):
+        cache.clear()  # throttle counters
+
+    def test_serves_candles_oldest_first(self, _refresh):
+        start = datetime(2026, 10, 19, 10, 0, tzinfo=dt_timezone.utc)
+        for i in range(3):
+            update_candles({"BTC": 100 + i}, start + timedelta(minutes=5 * i))
+
+        response = self.client.get(self.url, {"interval": "5m", "limit": 2})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([c["close"] for c in response.json()],
+                         ["101.00", "102.00"])
+
+    def test_naive_start_is_treated_as_utc(self, _refresh):
+        start = datetime(2026, 10, 19, 10, 0, tzinfo=dt_timezone.utc)
+        for i in range(3):
+            update_candles({"BTC": 100 + i}, start + timedelta(minutes=5 * i))
+
+        with warnings.catch_warnings():
+            # naive datetimes in a query raise a RuntimeWarning
+            warnings.simplefilter("error", RuntimeWarning)
+            response = self.client.get(
+                self.url, {"interval": "5m", "start": "2026-10-19T10:05:00"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([c["open_time"] for c in response.json()],
+                         ["2026-10-19T10:05:00Z", "2026-10-19T10:10:00Z"])
+
+    def test_bad_parameters_return_400(self, _refresh):
+        bad = [
+            {"interval": "2m"},
+            {"limit": "abc"},
+            {"limit": "0"},
+            {"limit": "-1"},
+            {"start": "yesterday"},
+            {"start": "2026-13-01T00:00:00"},
+            {"end": "2026-02-30T00:00:00"},
+        ]
+        for params in bad:
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(next(iter(params)), response.json())
+
+
+class LazyImportTests(TestCase):
+    def test_worker_boot_does_not_import_heavy_modules(self):
+        # fresh interpreter - this test process has imported everything
+        code = BOOT_CODE + (
+            "import json, sys\n"
+            f"print(json.dumps([m for m in {HEAVY_MODULES!r} "
+            "if m in sys.modules]))\n"
+        )
+        env = dict(os.environ)
+        env.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+        result = subprocess.run([sys.executable, "-c", code],
+                                cwd=settings.BASE_DIR, env=env,
+                                capture_output=True, text=True, check=False)
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        loaded = json.loads(result.stdout.strip().splitlines()[-1])
+        self.assertEqual(loaded, [])
+
+    def test_parse_importtime_builds_tree(self):
+        output = "\n".join([
+            "import time: self [us] | cumulative | imported package",
+            "import time:        10 |         10 |       c",
+            "import time:        20 |         30 |     b",
+            "import time:         5 |          5 |     d",
+            "import time:        40 |         75 |   a",
+            "import time:         7 |          7 |   e",
+            "import time:        50 |        125 | root",
+            "some unrelated stderr line",
+            "import time:         3 |          3 | other",
+        ])
+
+        roots = parse_importtime(output)
+
+        self.assertEqual([n.name for n in roots], ["root", "other"])
+        root = roots[0]
+        self.assertEqual((root.self_us, root.cumulative_us), (50, 125))
+        self.assertEqual([n.name for n in root.children], ["a", "e"])
+        a = root.children[0]
+        self.assertEqual([n.name for n in a.children], ["b", "d"])
+        self.assertEqual([n.name for n in a.children[0].children], ["c"])
@@ -0,0 +1,104 @@
+import hashlib
+
+from django.conf import settings
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class SlidingWindowRateThrottle(SimpleRateThrottle):
+    """
+    Sliding-window counter throttle.
+
+    DRF's built-in throttles keep a list of every request timestamp in the
+    cache and trim it on each call, so the cost grows with the rate limit.
+    Here we only keep two integer counters per client (the current and the
+    previous fixed window) and estimate the sliding window from them:
+
+        estimated = previous * (time left of previous window) + current
+
+    That is two cache round trips per allowed request whatever the rate:
+    get_many(), then incr() - or set() for the first request of a window.
+    A throttled request only does the get_many().
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True  # this throttle does not apply to the request
+
+        self.now = self.timer()
+        window = int(self.now // self.duration)
+        elapsed = self.now - window * self.duration
+
+        current_key = f"{self.key}:{window}"
+        previous_key = f"{self.key}:{window - 1}"
+        counts = self.cache.get_many([current_key, previous_key])
+        current = counts.get(current_key, 0)
+        previous = counts.get(previous_key, 0)
+
+        weight = 1 - elapsed / self.duration
+        if previous * weight + current >= self.num_requests:
+            self.wait_seconds = self._seconds_until_allowed(
+                previous, current, elapsed)
+            return False
+
+        # counters only need to outlive the window after their own
+        timeout = int(self.duration * 2)
+        if current_key in counts:
+            try:
+                self.cache.incr(current_key)
+            except ValueError:  # expired since get_many()
+                self.cache.set(current_key, 1, timeout)
+        else:
+            self.cache.set(current_key, 1, timeout)
+        return True
+
+    def _seconds_until_allowed(self, previous, current, elapsed):
+        if current >= self.num_requests or previous == 0:
+            return self.duration - elapsed
+        # solve previous * (1 - t / duration) + current < num_requests for t
+        allowed_at = self.duration * (
+            1 - (self.num_requests - current) / previous)
+        return max(allowed_at - elapsed, 0)
+
+    def wait(self):
+        return getattr(self, "wait_seconds", None)
+
+
+def _api_key(request):
+    # Keys are only honoured if they are listed in settings, otherwise a
+    # client could dodge the per-IP limit by sending a random key each time
+    key = request.headers.get("X-API-Key")
+    if key and key in settings.CRYPTO_API_KEYS:
+        return key
+    return None
+
+
+class CryptoAnonRateThrottle(SlidingWindowRateThrottle):
+    """Limits requests without a known API key, per client IP."""
+    scope = "crypto_anon"
+
+    def get_cache_key(self, request, view):
+        if _api_key(request):
+            return None
+
+        return self.cache_format % {
+            "scope": self.scope,
+            "ident": self.get_ident(request),
+        }
+
+
+class CryptoKeyRateThrottle(SlidingWindowRateThrottle):
+    """Limits requests carrying a known X-API-Key header, per key."""
+    scope = "crypto_key"
+
+    def get_cache_key(self, request, view):
+        key = _api_key(request)
+        if key is None:
+            return None
+
+        # hash so the raw key never ends up in the cache backend
+        ident = hashlib.sha256(key.encode()).hexdigest()[:32]
+        return self.cache_format % {"scope": self.scope, "ident": ident}
@@ -1,6 +1,8 @@
 from django.urls import path
-from .views import (CryptoPriceListView, CryptoPriceDetailView,
-                    refresh_status_view)
+from .views import (CandleListView, CryptoPriceListView,
+                    CryptoPriceDetailView,
+                    HoldingDetailView, HoldingListCreateView, PortfolioView,
+                    PriceAlertListCreateView, refresh_status_view)
 
 urlpatterns = [
     # Specific routes must come BEFORE dynamic routes
@@ -9,6 +11,14 @@ urlpatterns = [
 
     # data endpoints
     path("prices/", CryptoPriceListView.as_view(), name="crypto-prices"),
+    path("alerts/", PriceAlertListCreateView.as_view(), name="price-alerts"),
+    path("portfolio/", PortfolioView.as_view(), name="portfolio"),
+    path("portfolio/holdings/",
+         HoldingListCreateView.as_view(), name="portfolio-holdings"),
+    path("portfolio/holdings/<int:pk>/",
+         HoldingDetailView.as_view(), name="portfolio-holding-detail"),
+    path("<str:symbol>/candles/",
+         CandleListView.as_view(), name="crypto-candles"),
     path("<str:symbol>/",
          CryptoPriceDetailView.as_view(), name="crypto-price-detail"),
 ]
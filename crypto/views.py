@@ -1,9 +1,22 @@
-from django.http import Http404, JsonResponse
-from rest_framework.generics import ListAPIView, RetrieveAPIView
+from django.http import Http404
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.decorators import api_view
+from rest_framework.generics import (ListAPIView, ListCreateAPIView,
+                                     RetrieveAPIView,
+                                     RetrieveUpdateDestroyAPIView)
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from crypto.coalescing import CoalescingMixin
+from crypto.services.candles import INTERVALS
+from crypto.services.portfolio import value_portfolio
 from crypto.services.price_refresher import refresh_prices_if_stale
 from crypto.models import DataRefreshStatus
-from .models import CryptoPrice
-from .serializers import CryptoPriceSerializer
+from .models import Candle, CryptoPrice, Holding, PriceAlert
+from .serializers import (CandleSerializer, CryptoPriceSerializer,
+                          HoldingSerializer, PriceAlertSerializer)
 
 
 # ListAPIView - Get multiple objects (a list)
@@ -13,7 +26,12 @@ from .serializers import CryptoPriceSerializer
 # Create your views here. (class based views in this example)
 
 
-class CryptoPriceListView(ListAPIView):
+# Throttling comes from REST_FRAMEWORK["DEFAULT_THROTTLE_CLASSES"] in
+# settings, so every DRF view here is rate limited per IP / per API key.
+# CoalescingMixin must come first so its get() wraps ListAPIView.get()
+
+
+class CryptoPriceListView(CoalescingMixin, ListAPIView):
     serializer_class = CryptoPriceSerializer
 
     def get_queryset(self):  # called automatically -> useful for refresh
@@ -39,7 +57,7 @@ class CryptoPriceListView(ListAPIView):
 #  — prefix indicates request is intentionally unused - no yellow squiggly
 
 
-class CryptoPriceDetailView(RetrieveAPIView):
+class CryptoPriceDetailView(CoalescingMixin, RetrieveAPIView):
     serializer_class = CryptoPriceSerializer
     # lookup_field is a built-in attribute in Django REST Framework's
     # generic views (like RetrieveAPIView, UpdateAPIView, DestroyAPIView
@@ -59,15 +77,112 @@ class CryptoPriceDetailView(RetrieveAPIView):
         except CryptoPrice.DoesNotExist as exc:
             raise Http404("Crypto symbol not found.") from exc
 
+# e.g. /api/crypto/btc/candles/?interval=1h&start=2026-10-01T00:00:00Z
+# start / end are optional, limit caps the number of (most recent) candles
+
+
+class CandleListView(CoalescingMixin, ListAPIView):
+    serializer_class = CandleSerializer
+    MAX_LIMIT = 1000
+
+    def get_queryset(self):
+        refresh_prices_if_stale()
+        params = self.request.query_params
+
+        interval = params.get("interval", "1h")
+        if interval not in INTERVALS:
+            raise ValidationError(
+                {"interval": f"Must be one of {', '.join(INTERVALS)}."})
+
+        # symbol is stored upper case, so an exact match can use the
+        # (symbol, interval, open_time) index for the range scan
+        candles = Candle.objects.filter(
+            symbol=self.kwargs["symbol"].upper(), interval=interval)
+
+        for name, lookup in (("start", "open_time__gte"),
+                             ("end", "open_time__lt")):
+            if name in params:
+                error = {name: "Must be an ISO 8601 datetime."}
+                try:
+                    value = parse_datetime(params[name])
+                except ValueError as exc:  # well formed but not a real date
+                    raise ValidationError(error) from exc
+                if value is None:
+                    raise ValidationError(error)
+                if timezone.is_naive(value):  # no offset given -> UTC
+                    value = timezone.make_aware(value)
+                candles = candles.filter(**{lookup: value})
+
+        try:
+            limit = int(params.get("limit", 500))
+            if limit < 1:
+                raise ValueError
+        except ValueError as exc:
+            raise ValidationError(
+                {"limit": "Must be a positive integer."}) from exc
+        limit = min(limit, self.MAX_LIMIT)
+
+        # newest `limit` candles, returned oldest first for charting
+        return list(candles.order_by("-open_time")[:limit])[::-1]
+
+
+# No CoalescingMixin here - the response depends on request.user, so
+# sharing it between identical URLs would leak one user's alerts to another
+
+
+class PriceAlertListCreateView(ListCreateAPIView):
+    serializer_class = PriceAlertSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return (PriceAlert.objects.filter(user=self.request.user)
+                .order_by("-created_at"))
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+# Portfolio views are per-user too, so again no CoalescingMixin
+
+
+class PortfolioView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        refresh_prices_if_stale()
+        return Response(value_portfolio(request.user))
+
+
+class HoldingListCreateView(ListCreateAPIView):
+    serializer_class = HoldingSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return Holding.objects.filter(user=self.request.user).order_by(
+            "symbol")
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+
+class HoldingDetailView(RetrieveUpdateDestroyAPIView):
+    serializer_class = HoldingSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        # filtering by user makes other users' holdings a 404
+        return Holding.objects.filter(user=self.request.user)
+
 # _request means: “this argument is required but intentionally unused”
 # Django always sends a request object even if we dont use it
 # The below is a function based view
+# @api_view turns it into a DRF view so the default throttles apply to it
 
 
+@api_view(["GET"])
 def refresh_status_view(_request):
     status = DataRefreshStatus.objects.first()
 
-    return JsonResponse({
+    return Response({
         "last_updated": status.last_updated.isoformat() if status else None
     })
 